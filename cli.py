@@ -4,6 +4,7 @@ CLI for Accessing Deenis
 """
 # Standard Imports
 import sys
+import json
 from pathlib import Path
 
 # Module Imports
@@ -30,14 +31,71 @@ def add_records():
     pass
 
 
-@add_records.command("host", help="Add a Host Record")
-@click.option("-c", "--config-file", "config_file", help="Path to YAML Config File")
-@click.option("-4", "--ipv4-address", "ipv4", default=None, help="IPv4 Address")
-@click.option("-6", "--ipv6-address", "ipv6", default=None, help="IPv6 Address")
-@click.option("-f", "--fqdn", "fqdn", required=True, help="FQDN")
-def host(**click_input):
-    """Add host records from CLI"""
-    if not click_input["config_file"]:
+def echo_responses(responses):
+    """
+    Prints provider responses. Response format:
+    [
+        (
+            'Success',
+            'A',
+            'test011.omnificent.io',
+            '199.34.95.250',
+            []
+        ),
+        (
+            'Success',
+            'PTR',
+            '250',
+            'test011.omnificent.io',
+            []
+        )
+    ]
+    """
+    nl = "\n"
+    tab = "  "
+    _text = {"fg": "white", "bold": True}
+    _stat_suc = {"fg": "green", "bold": True}
+    _stat_fail = {"fg": "red", "bold": True}
+    _rec_type = {"fg": "yellow", "bold": True}
+    _rec_name = {"fg": "magenta", "bold": True}
+    _rec_trgt = {"fg": "cyan", "bold": True}
+    _error = {"fg": "red"}
+    click.secho(nl + "Records:" + nl, **_text)
+    for res in responses:
+        status, rec_type, rec_name, rec_trgt, errors = res
+        if status == "Success":
+            _status = ("⚡ " + status, _stat_suc)
+        elif status == "Failure":
+            _status = ("☝ " + status, _stat_fail)
+        click.echo(
+            tab
+            + click.style(_status[0], **_status[1])
+            + nl
+            + tab * 4
+            + click.style(rec_type, **_rec_type)
+            + click.style(" ⟫ ", **_text)
+            + click.style(rec_name, **_rec_name)
+            + click.style(" ⟩ ", **_text)
+            + click.style(rec_trgt, **_rec_trgt)
+        )
+        if errors:
+            click.echo(tab * 4 + click.style("Errors: ", **_stat_fail))
+            for err in errors:
+                if isinstance(err, dict):
+                    for ename in err.keys():
+                        click.echo(
+                            tab * 6
+                            + click.style(str(ename) + ":", **_error)
+                            + tab
+                            + click.style(str(err[ename]), **_error)
+                        )
+                elif isinstance(err, str):
+                    click.echo(tab * 4 + click.style(err, **_error))
+
+
+def get_config_path(config_file):
+    """Resolves the config file path, defaulting to ./deenis.yaml"""
+    if not config_file:
         config_path = Path.cwd().joinpath("deenis.yaml")
         if not config_path.exists():
             raise click.UsageError(
@@ -50,8 +108,25 @@ def host(**click_input):
                     bold=True,
                 )
             )
-    elif click_input["config_file"]:
-        config_path = Path().resolve(click_input["config_file"])
+    else:
+        config_path = Path(config_file).resolve()
+        if not config_path.is_file():
+            raise click.UsageError(
+                click.style(
+                    f"Config file {config_path} not found.", fg="red", bold=True
+                )
+            )
+    return config_path
+
+
+@add_records.command("host", help="Add a Host Record")
+@click.option("-c", "--config-file", "config_file", help="Path to YAML Config File")
+@click.option("-4", "--ipv4-address", "ipv4", default=None, help="IPv4 Address")
+@click.option("-6", "--ipv6-address", "ipv6", default=None, help="IPv6 Address")
+@click.option("-f", "--fqdn", "fqdn", required=True, help="FQDN")
+def host(**click_input):
+    """Add host records from CLI"""
+    config_path = get_config_path(click_input["config_file"])
     if not click_input["ipv4"] and not click_input["ipv6"]:
         raise click.UsageError(
             click.style("At least one IP Address is required", fg="red", bold=True)
@@ -113,21 +188,7 @@ def host(**click_input):
 )
 def tenant_reverse(**click_input):
     """Add Tenant Records from CLI"""
-    if not click_input["config_file"]:
-        config_path = Path.cwd().joinpath("deenis.yaml")
-        if not config_path.exists():
-            raise click.UsageError(
-                click.style(
-                    (
-                        f"Config file not specified and not found at {config_path}. "
-                        "Please specify a config file path."
-                    ),
-                    fg="red",
-                    bold=True,
-                )
-            )
-    elif click_input["config_file"]:
-        config_path = Path().resolve(click_input["config_file"])
+    config_path = get_config_path(click_input["config_file"])
     if not click_input["prefix4"] and not click_input["prefix6"]:
         raise click.UsageError(
             click.style("At least one prefix is required", fg="red", bold=True)
@@ -142,67 +203,158 @@ def tenant_reverse(**click_input):
                 "prefix6": click_input["prefix6"],
             }
         )
-        """
-        Response format:
-        [
-            (
-                'Success',
-                'A',
-                'test011.omnificent.io',
-                '199.34.95.250',
-                []
-            ),
-            (
-                'Success',
-                'PTR',
-                '250',
-                'test011.omnificent.io',
-                []
-            )
-        ]
-        """
-        nl = "\n"
-        tab = "  "
-        _text = {"fg": "white", "bold": True}
-        _stat_suc = {"fg": "green", "bold": True}
-        _stat_fail = {"fg": "red", "bold": True}
-        _rec_type = {"fg": "yellow", "bold": True}
-        _rec_name = {"fg": "magenta", "bold": True}
-        _rec_trgt = {"fg": "cyan", "bold": True}
-        _error = {"fg": "red"}
-        click.secho(nl + "Records:" + nl, **_text)
-        for res in responses:
-            status, rec_type, rec_name, rec_trgt, errors = res
-            if status == "Success":
-                _status = ("⚡ " + status, _stat_suc)
-            elif status == "Failure":
-                _status = ("☝ " + status, _stat_fail)
+        echo_responses(responses)
+    except (AttributeError, RuntimeError) as tenant_error:
+        raise click.ClickException(tenant_error)
+
+
+@add_records.group("plan", help="Plan Record Changes Without Applying Them")
+def plan():
+    """Click Command Group Definition"""
+    # pylint: disable=unnecessary-pass
+    pass
+
+
+def write_plan(change_plan, output_file):
+    """Writes a compiled plan to a JSON file & prints a summary"""
+    with open(output_file, "w") as plan_json:
+        json.dump(change_plan, plan_json, separators=(",", ":"))
+    nl = "\n"
+    tab = "  "
+    click.secho(nl + "Plan:" + nl, fg="white", bold=True)
+    for provider, provider_plan in change_plan["providers"].items():
+        account = provider_plan["account"]
+        click.secho(
+            tab + f"{provider} account {account['email']} at {account['baseurl']}",
+            fg="white",
+        )
+        for zone_id, zone_plan in provider_plan["zones"].items():
             click.echo(
-                tab
-                + click.style(_status[0], **_status[1])
+                tab * 2
+                + click.style(zone_plan["zone"], fg="yellow", bold=True)
+                + click.style(f" ({zone_id})", fg="white")
                 + nl
                 + tab * 4
-                + click.style(rec_type, **_rec_type)
-                + click.style(" ⟫ ", **_text)
-                + click.style(rec_name, **_rec_name)
-                + click.style(" ⟩ ", **_text)
-                + click.style(rec_trgt, **_rec_trgt)
+                + click.style(f"{len(zone_plan['create'])} to create", fg="green")
+                + ", "
+                + click.style(f"{len(zone_plan['update'])} to overwrite", fg="red")
             )
-            if errors:
-                click.echo(tab * 4 + click.style("Errors: ", **_stat_fail))
-                for err in errors:
-                    if isinstance(err, dict):
-                        for ename in err.keys():
-                            click.echo(
-                                tab * 6
-                                + click.style(str(ename) + ":", **_error)
-                                + tab
-                                + click.style(str(err[ename]), **_error)
-                            )
-                    elif isinstance(err, str):
-                        click.echo(tab * 4 + click.style(err, **_error))
-    except (AttributeError, RuntimeError) as tenant_error:
-        raise click.ClickException(tenant_error)
+    if not change_plan["providers"]:
+        click.secho(tab + "No changes", fg="magenta", bold=True)
+    if any(
+        zone_plan["update"]
+        for provider_plan in change_plan["providers"].values()
+        for zone_plan in provider_plan["zones"].values()
+    ):
+        click.secho(
+            nl + "Applying this plan will overwrite existing records.",
+            fg="red",
+            bold=True,
+        )
+    click.secho(
+        "This plan can only be applied to the account it was made against.",
+        fg="white",
+    )
+    click.secho(nl + f"Plan written to {output_file}", fg="white", bold=True)
+
+
+@plan.command("host", help="Plan a Host Record")
+@click.option("-c", "--config-file", "config_file", help="Path to YAML Config File")
+@click.option("-4", "--ipv4-address", "ipv4", default=None, help="IPv4 Address")
+@click.option("-6", "--ipv6-address", "ipv6", default=None, help="IPv6 Address")
+@click.option("-f", "--fqdn", "fqdn", required=True, help="FQDN")
+@click.option(
+    "-o", "--output", "output_file", required=True, help="Path to Write Plan File"
+)
+@click.option(
+    "--replace",
+    "replace",
+    is_flag=True,
+    help="Overwrite Existing Records With the Same Type & Name",
+)
+def plan_host(**click_input):
+    """Plan host records from CLI"""
+    config_path = get_config_path(click_input["config_file"])
+    if not click_input["ipv4"] and not click_input["ipv6"]:
+        raise click.UsageError(
+            click.style("At least one IP Address is required", fg="red", bold=True)
+        )
+    try:
+        change_plan = Deenis(str(config_path)).PlanHost(
+            {
+                "hostname": click_input["fqdn"],
+                "ipv4": click_input["ipv4"],
+                "ipv6": click_input["ipv6"],
+            },
+            replace=click_input["replace"],
+        )
+        write_plan(change_plan, click_input["output_file"])
+    except (AttributeError, RuntimeError) as plan_error:
+        raise click.ClickException(plan_error)
+
+
+@plan.command("tenant", help="Plan Bulk PTR Records for a Tenant/Customer")
+@click.option("-c", "--config-file", "config_file", help="Path to YAML Config File")
+@click.option(
+    "-i", "--crm-id", "crm_id", default=None, help="Unique Tenant Indentifier"
+)
+@click.option(
+    "-4", "--ipv4-prefix", "prefix4", default=None, help="IPv4 Prefix Assignment"
+)
+@click.option(
+    "-6", "--ipv6-prefix", "prefix6", default=None, help="IPv6 Prefix Assignment"
+)
+@click.option(
+    "-f4", "--ipv4-fqdn", "host4", default=None, help="FQDN for IPv4 PTR Target"
+)
+@click.option(
+    "-f6", "--ipv6-fqdn", "host6", default=None, help="FQDN for IPv6 PTR Target"
+)
+@click.option(
+    "-o", "--output", "output_file", required=True, help="Path to Write Plan File"
+)
+@click.option(
+    "--replace",
+    "replace",
+    is_flag=True,
+    help="Overwrite Existing Records With the Same Type & Name",
+)
+def plan_tenant(**click_input):
+    """Plan Tenant Records from CLI"""
+    config_path = get_config_path(click_input["config_file"])
+    if not click_input["prefix4"] and not click_input["prefix6"]:
+        raise click.UsageError(
+            click.style("At least one prefix is required", fg="red", bold=True)
+        )
+    try:
+        change_plan = Deenis(str(config_path)).PlanTenant(
+            {
+                "crm_id": click_input["crm_id"],
+                "host4": click_input["host4"],
+                "host6": click_input["host6"],
+                "prefix4": click_input["prefix4"],
+                "prefix6": click_input["prefix6"],
+            },
+            replace=click_input["replace"],
+        )
+        write_plan(change_plan, click_input["output_file"])
+    except (AttributeError, RuntimeError) as plan_error:
+        raise click.ClickException(plan_error)
+
+
+@add_records.command("apply", help="Apply a Plan File")
+@click.option("-c", "--config-file", "config_file", help="Path to YAML Config File")
+@click.argument("plan_file", type=click.Path(exists=True, dir_okay=False))
+def apply_plan(**click_input):
+    """Apply a plan file from CLI"""
+    config_path = get_config_path(click_input["config_file"])
+    try:
+        responses = Deenis(str(config_path)).Apply(click_input["plan_file"])
+        echo_responses(responses)
+        if not responses:
+            click.secho("\nNo records were added", fg="magenta", bold=True)
+    except (AttributeError, RuntimeError) as apply_error:
+        raise click.ClickException(apply_error)
 
 
 if __name__ == "__main__":
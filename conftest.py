@@ -0,0 +1,4 @@
+"""
+Pytest configuration. Keeps the repository root on sys.path so that the
+deenis package & cli.py import without installing them.
+"""
@@ -48,6 +48,39 @@ class Deenis:
                 if provider in self.conf["zone"][zone]["providers"]:
                     self.zp_map[provider].append(zone)
 
+    def preflight(self, records):
+        """
+        Validates the full constructed record set before any API call
+        is made. De-duplicates identical records, rejects conflicting
+        ones, and verifies every zone & provider mapping in one pass.
+
+        Returns the de-duplicated record list.
+        """
+        records = construct.dedupe_records(records)
+        errors = []
+        checked = set()
+        for record in records:
+            zone_name = [zone for zone in record.keys()][0]
+            if zone_name in checked:
+                continue
+            checked.add(zone_name)
+            zone_conf = self.conf["zone"].get(zone_name, None)
+            if not zone_conf:
+                errors.append("Zone {} is not defined".format(zone_name))
+                continue
+            zone_providers = zone_conf.get("providers")
+            if not zone_providers:
+                errors.append("Zone {} has no providers".format(zone_name))
+                continue
+            for provider in zone_providers:
+                if not self.conf["provider"].get(provider, None):
+                    errors.append("Provider {} is not defined".format(provider))
+                elif provider not in call.providers:
+                    errors.append("Provider {} is not supported".format(provider))
+        if errors:
+            raise AttributeError("; ".join(errors))
+        return records
+
     def map_zones(self, records):
         """
         Maps input record data to configured providers and zones.
@@ -72,17 +105,36 @@ class Deenis:
                 add_map[provider] = (provider_conf, filtered_records)
         return add_map
 
+    def add_records(self, records):
+        """
+        Validates constructed records as one set, then adds them via
+        each mapped provider.
+        """
+        output = []
+        for provider, params in self.map_zones(self.preflight(records)).items():
+            response_class = call.providers[provider]
+            output.extend(response_class(params[0]).add_record(params[1]))
+        return output
+
     def AddHost(self, input_params):
         """
         Attempts to add a "single" host record. For a given FQDN, will
         add A, AAAA, and 2 PTR records.
         """
         records = construct.host_records(**input_params)
-        add_map = self.map_zones(records)
-        for provider, params in add_map.items():
-            response_class = getattr(call, provider)
-            provider_response = response_class(params[0]).add_record(params[1])
-            return provider_response
+        return self.add_records(records)
+
+    def BulkAddHost(self, input_list):
+        """
+        Adds host records for a list of AddHost inputs. Records from
+        every input are validated together, so overlapping inputs are
+        only added once and conflicting inputs fail before any are
+        added.
+        """
+        records = []
+        for input_params in input_list:
+            records.extend(construct.host_records(**input_params))
+        return self.add_records(records)
 
     def TenantReverse(self, input_params):
         """
@@ -95,11 +147,129 @@ class Deenis:
             "prefix6": "2001:db8::/48"
         }
         """
-        if input_params["crm_id"] and isinstance(input_params["crm_id"], int):
-            input_params["crm_id"] = str(input_params["crm_id"])
         records = construct.tenant_records(**input_params)
-        add_map = self.map_zones(records)
-        for provider, params in add_map.items():
-            response_class = getattr(call, provider)
-            provider_response = response_class(params[0]).add_record(params[1])
-            return provider_response
+        return self.add_records(records)
+
+    def BulkTenantReverse(self, input_list):
+        """
+        Adds tenant records for a list of TenantReverse inputs. Records
+        from every input are validated together, so overlapping inputs
+        are only added once and conflicting inputs fail before any are
+        added.
+        """
+        records = []
+        for input_params in input_list:
+            records.extend(construct.tenant_records(**input_params))
+        return self.add_records(records)
+
+    def compile_plan(self, records, replace=False):
+        """
+        Compiles constructed records into a serializable plan of changes,
+        grouped by provider, zone ID, and operation. A plan is bound to
+        the provider accounts it was made against. See each provider's
+        plan_records for the per-account format.
+        """
+        plan = {"version": 1, "providers": {}}
+        for provider, params in self.map_zones(self.preflight(records)).items():
+            response_class = call.providers[provider]
+            provider_plan = response_class(params[0]).plan_records(
+                params[1], replace=replace
+            )
+            if provider_plan["zones"]:
+                plan["providers"][provider] = provider_plan
+        return plan
+
+    def PlanHost(self, input_params, replace=False):
+        """
+        Plans the records AddHost would add, without adding them. With
+        replace, an existing record of the same type & name is planned
+        to be overwritten rather than added alongside.
+        """
+        records = construct.host_records(**input_params)
+        return self.compile_plan(records, replace=replace)
+
+    def PlanTenant(self, input_params, replace=False):
+        """
+        Plans the records TenantReverse would add, without adding them.
+        With replace, an existing record of the same type & name is
+        planned to be overwritten rather than added alongside.
+        """
+        records = construct.tenant_records(**input_params)
+        return self.compile_plan(records, replace=replace)
+
+    @staticmethod
+    def validate_plan(plan):
+        """
+        Verifies a plan has the structure compile_plan produces.
+        """
+        if not isinstance(plan, dict) or plan.get("version") != 1:
+            raise AttributeError("Plan is not a supported Deenis plan")
+        if not isinstance(plan.get("providers"), dict):
+            raise AttributeError("Plan has no providers")
+        record_keys = {"type", "name", "content"}
+        zone_keys = {"zone": str, "fingerprint": str, "create": list, "update": list}
+        for provider, provider_plan in plan["providers"].items():
+            if not isinstance(provider_plan, dict):
+                raise AttributeError("Plan for {} is invalid".format(provider))
+            account = provider_plan.get("account")
+            if not isinstance(account, dict) or set(account) != {"baseurl", "email"}:
+                raise AttributeError("Plan for {} has no account".format(provider))
+            if not isinstance(provider_plan.get("zones"), dict):
+                raise AttributeError("Plan for {} has no zones".format(provider))
+            for zone_id, zone_plan in provider_plan["zones"].items():
+                if not isinstance(zone_plan, dict):
+                    raise AttributeError(
+                        "Plan for zone ID {} is invalid".format(zone_id)
+                    )
+                for key, key_type in zone_keys.items():
+                    if not isinstance(zone_plan.get(key), key_type):
+                        raise AttributeError(
+                            "Plan for zone ID {} has no {}".format(zone_id, key)
+                        )
+                records = zone_plan["create"] + zone_plan["update"]
+                for params in records:
+                    if not isinstance(params, dict) or not record_keys <= set(params):
+                        raise AttributeError(
+                            "Plan for zone {} has an incomplete record".format(
+                                zone_plan["zone"]
+                            )
+                        )
+                if not all("id" in params for params in zone_plan["update"]):
+                    raise AttributeError(
+                        "Plan for zone {} has an update with no record ID".format(
+                            zone_plan["zone"]
+                        )
+                    )
+
+    def Apply(self, plan):
+        """
+        Applies a plan from PlanHost or PlanTenant, as a dictionary or
+        the path to a JSON plan file. Raises an exception without making
+        any changes if the plan was made against a different provider
+        account, or if any planned zone has changed since it was made.
+        """
+        if isinstance(plan, str):
+            plan_path = Path(plan).resolve()
+            if not plan_path.exists():
+                raise FileNotFoundError("Plan file {} not found.".format(plan_path))
+
+            import json
+
+            with open(plan_path) as plan_json:
+                try:
+                    plan = json.load(plan_json)
+                except ValueError:
+                    raise AttributeError(
+                        "Plan file {} is not valid JSON".format(plan_path)
+                    )
+        self.validate_plan(plan)
+        output = []
+        for provider, provider_plan in plan["providers"].items():
+            provider_conf = self.conf["provider"].get(provider, None)
+            if not provider_conf:
+                raise AttributeError("Provider {} is not defined".format(provider))
+            if provider not in call.providers:
+                raise AttributeError("Provider {} is not supported".format(provider))
+            response_class = call.providers[provider]
+            output.extend(response_class(provider_conf).apply_plan(provider_plan))
+        return output
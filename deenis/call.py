@@ -4,7 +4,11 @@ Defines and Executes Actions Per-Provider
 
 # Standard Imports
 import json
+import hashlib
 import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Module Imports
 import requests
@@ -14,9 +18,74 @@ cache_dir = tempfile.mkdtemp()
 
 cache = diskcache.Cache(cache_dir)
 
+# In-process LRU in front of the disk cache, plus in-flight zone lookups, all
+# keyed by (API URL, account email, zone name). The LRU and in-flight lookups
+# are guarded by cache_lock.
+cache_lock = threading.Lock()
+lru_size = 256
+lru_cache = OrderedDict()
+inflight = {}
+
+
+def lru_get(key):
+    """Gets a value from the in-process LRU, marking it most recently used"""
+    with cache_lock:
+        value = lru_cache.get(key)
+        if value is not None:
+            lru_cache.move_to_end(key)
+    return value
+
+
+def lru_set(key, value):
+    """Sets a value in the in-process LRU, evicting the least recently used"""
+    with cache_lock:
+        lru_cache[key] = value
+        lru_cache.move_to_end(key)
+        while len(lru_cache) > lru_size:
+            lru_cache.popitem(last=False)
+
+
+def record_params(target_params):
+    """Constructs provider API parameters from constructed record parameters"""
+    return {
+        "type": target_params["type"],
+        "name": target_params["name"],
+        "content": target_params["content"],
+        "ttl": target_params.get("ttl", 1),
+        "proxied": target_params.get("proxied", False),
+    }
+
+
+def record_fqdn(name, zone):
+    """Expands a zone-relative record name (e.g. a PTR's last octet) to a full name"""
+    if name == zone or name.endswith("." + zone):
+        return name
+    return ".".join([name, zone])
+
+
+def zone_fingerprint(records):
+    """Hashes the type, name, content, TTL, and proxy status of a zone's existing \
+    records, regardless of order, so that a plan can detect a zone changing \
+    underneath it"""
+    state = sorted(
+        [
+            rec["type"],
+            rec["name"].lower(),
+            rec["content"],
+            rec.get("ttl"),
+            bool(rec.get("proxied")),
+        ]
+        for rec in records
+    )
+    return hashlib.sha256(json.dumps(state).encode()).hexdigest()
+
 
 class cloudflare:
-    """Cloudflare-specific functions"""
+    """
+    Cloudflare-specific functions. Safe to share across threads: each
+    call uses its own session, and concurrent zone ID lookups for the
+    same zone collapse into a single API request.
+    """
 
     # pylint: disable=too-few-public-methods,invalid-name
     # Dear Pylint: Sometimes, one must make one's code scalable for future additions. This is one
@@ -24,6 +93,11 @@ class cloudflare:
     #
     # invalid-name disabled so that class name can be dynamically called.
 
+    # Maximum number of record changes sent in a single batch request
+    batch_size = 200
+    # Maximum number of zones planned or applied concurrently
+    max_workers = 8
+
     def __init__(self, provider_conf):
         self.api = provider_conf["api"]
         self.url = self.api["baseurl"]
@@ -40,33 +114,64 @@ class cloudflare:
         return session
 
     def get_zone_id(self, zone):
-        """Gets Cloudflare zone_id by querying the list of zones endpoint, filtered by the zone \
-        name being queried"""
-        zone_id = cache.get(zone)
-        if not zone_id:
-            try:
-                endpoint = self.url + "zones/"
-                params = {"name": zone}
-                with self.provider_session().get(endpoint, params=params) as res_raw:
-                    res_json = res_raw.json()
-                    if res_raw.status_code in (401, 403, 405, 415, 429):
-                        # For HTTP responses that would indicate a code-level issue, raise exception
-                        raise RuntimeError(
-                            (
-                                res_raw.status_code,
-                                *tuple(params.values()),
-                                res_json["errors"],
-                            )
-                        )
-                    if res_json["result"]:
-                        cache.add(zone, res_json["result"][0]["id"])
-                        zone_id = cache.get(zone)
-                    if not res_json["result"]:
-                        raise AttributeError(f"Zone Lookup Failed for {zone}")
-            except requests.exceptions.RequestException as req_exception:
-                raise RuntimeError(req_exception)
+        """Gets Cloudflare zone_id, checking the in-process LRU, then the disk cache, \
+        then the API. Only one API lookup per zone is in flight at a time; concurrent \
+        callers wait for and share its result. Cached IDs are scoped to the API URL \
+        and account, so instances for different accounts never share them"""
+        cache_key = (self.url, self.api["email"], zone)
+        zone_id = lru_get(cache_key)
+        if zone_id:
+            return zone_id
+        zone_id = cache.get(cache_key)
+        if zone_id:
+            lru_set(cache_key, zone_id)
+            return zone_id
+        with cache_lock:
+            # Re-check under the lock in case a lookup finished since the first check
+            if cache_key in lru_cache:
+                return lru_cache[cache_key]
+            flight = inflight.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = Future()
+                inflight[cache_key] = flight
+        if not leader:
+            return flight.result()
+        try:
+            zone_id = self.fetch_zone_id(zone)
+            cache.set(cache_key, zone_id)
+            lru_set(cache_key, zone_id)
+            flight.set_result(zone_id)
+        except BaseException as lookup_exception:
+            flight.set_exception(lookup_exception)
+            raise
+        finally:
+            with cache_lock:
+                inflight.pop(cache_key, None)
         return zone_id
 
+    def fetch_zone_id(self, zone):
+        """Queries the list of zones endpoint, filtered by the zone name"""
+        try:
+            endpoint = self.url + "zones/"
+            params = {"name": zone}
+            with self.provider_session().get(endpoint, params=params) as res_raw:
+                res_json = res_raw.json()
+                if res_raw.status_code in (401, 403, 405, 415, 429):
+                    # For HTTP responses that would indicate a code-level issue, raise exception
+                    raise RuntimeError(
+                        (
+                            res_raw.status_code,
+                            *tuple(params.values()),
+                            res_json["errors"],
+                        )
+                    )
+                if not res_json["result"]:
+                    raise AttributeError(f"Zone Lookup Failed for {zone}")
+                return res_json["result"][0]["id"]
+        except requests.exceptions.RequestException as req_exception:
+            raise RuntimeError(req_exception)
+
     def add_record(self, targets):
         """Adds Cloudflare DNS record"""
         output = []
@@ -85,13 +190,7 @@ class cloudflare:
                 raise RuntimeError(
                     f"Error: Target Params are missing for Zone ID {zone_id}"
                 )
-            provider_params = {
-                "type": target_params["type"],
-                "name": target_params["name"],
-                "content": target_params["content"],
-                "ttl": target_params.get("ttl", 1),
-                "proxied": target_params.get("proxied", False),
-            }
+            provider_params = record_params(target_params)
             endpoint = "".join([self.url, "zones/", target_id, "/dns_records"])
             try:
                 with self.provider_session().post(
@@ -119,3 +218,216 @@ class cloudflare:
                 raise RuntimeError(req_exception)
         self.provider_session().close()
         return output
+
+    def list_records(self, zone_id):
+        """Gets all existing DNS records for a Cloudflare zone ID"""
+        endpoint = "".join([self.url, "zones/", zone_id, "/dns_records"])
+        records = []
+        page = 1
+        total_pages = 1
+        try:
+            with self.provider_session() as session:
+                while page <= total_pages:
+                    params = {"page": page, "per_page": 5000}
+                    with session.get(endpoint, params=params) as res_raw:
+                        res_json = res_raw.json()
+                        if not res_json.get("success", False):
+                            raise RuntimeError(
+                                (res_raw.status_code, zone_id, res_json["errors"])
+                            )
+                        records.extend(res_json["result"])
+                        total_pages = res_json["result_info"]["total_pages"]
+                    page += 1
+        except requests.exceptions.RequestException as req_exception:
+            raise RuntimeError(req_exception)
+        return records
+
+    def account(self):
+        """Identifies the API & account a plan was made against"""
+        return {"baseurl": self.url, "email": self.api["email"]}
+
+    def plan_zone(self, zone_name, zone_id, targets, replace=False):
+        """Diffs constructed records against a zone's existing records. Records that \
+        already exist are dropped and everything else is a create. With replace, a \
+        record replacing the only existing record of the same type & name becomes an \
+        update that overwrites its content, keeping its TTL & proxy status. Names are \
+        compared case-insensitively, as Cloudflare stores them in lowercase"""
+        existing = self.list_records(zone_id)
+        present = set()
+        by_name = {}
+        for rec in existing:
+            rec_name = rec["name"].lower()
+            present.add((rec["type"], rec_name, rec["content"]))
+            by_name.setdefault((rec["type"], rec_name), []).append(rec)
+        zone_plan = {
+            "zone": zone_name,
+            "fingerprint": zone_fingerprint(existing),
+            "create": [],
+            "update": [],
+        }
+        for target_params in targets:
+            provider_params = record_params(target_params)
+            fqdn = record_fqdn(provider_params["name"], zone_name).lower()
+            if (provider_params["type"], fqdn, provider_params["content"]) in present:
+                continue
+            same_name = by_name.get((provider_params["type"], fqdn), [])
+            if replace and len(same_name) == 1:
+                zone_plan["update"].append(
+                    {
+                        **provider_params,
+                        "id": same_name[0]["id"],
+                        "ttl": same_name[0].get("ttl", provider_params["ttl"]),
+                        "proxied": same_name[0].get(
+                            "proxied", provider_params["proxied"]
+                        ),
+                    }
+                )
+            else:
+                zone_plan["create"].append(provider_params)
+        return zone_plan
+
+    def plan_records(self, targets, replace=False):
+        """
+        Compiles constructed records into a plan of changes for this
+        account, grouped by zone ID and operation:
+
+        {
+            "account": {"baseurl": "https://...", "email": "name@example.com"},
+            "zones": {
+                "023e105f4ecef8ad9ca31a8372d0c353": {
+                    "zone": "example.com",
+                    "fingerprint": "9f86d08...",
+                    "create": [{"type": "A", "name": "host1.example.com", ...}],
+                    "update": [{"id": "372e6795...", "type": "A", ...}],
+                }
+            },
+        }
+
+        Updates are only planned with replace. Zones with no changes are
+        omitted.
+        """
+        zone_targets = {}
+        for target in targets:
+            zone_name = [zone for zone in target.keys()][0]
+            zone_targets.setdefault(zone_name, []).append(target[zone_name])
+        zone_ids = {
+            zone_name: self.get_zone_id(zone_name) for zone_name in zone_targets
+        }
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                zone_ids[zone_name]: executor.submit(
+                    self.plan_zone,
+                    zone_name,
+                    zone_ids[zone_name],
+                    zone_params,
+                    replace,
+                )
+                for zone_name, zone_params in zone_targets.items()
+            }
+            zone_plans = {
+                zone_id: future.result() for zone_id, future in futures.items()
+            }
+        return {
+            "account": self.account(),
+            "zones": {
+                zone_id: zone_plan
+                for zone_id, zone_plan in zone_plans.items()
+                if zone_plan["create"] or zone_plan["update"]
+            },
+        }
+
+    def verify_zone(self, zone_id, zone_plan):
+        """Raises an exception if a zone has changed since its plan was made"""
+        if zone_fingerprint(self.list_records(zone_id)) != zone_plan["fingerprint"]:
+            raise RuntimeError(
+                f"Zone {zone_plan['zone']} has changed since the plan was made"
+            )
+
+    def apply_zone(self, zone_id, zone_plan, failed):
+        """Applies a zone's planned changes via the batch DNS records endpoint. Each \
+        batch is atomic, but batches already sent are not rolled back. Once any batch \
+        fails (signalled across zones by the failed event), no further batches are \
+        sent and their changes are reported as not applied"""
+        output = []
+        endpoint = "".join([self.url, "zones/", zone_id, "/dns_records/batch"])
+        changes = [("posts", params) for params in zone_plan["create"]] + [
+            ("patches", params) for params in zone_plan["update"]
+        ]
+        try:
+            with self.provider_session() as session:
+                for start in range(0, len(changes), self.batch_size):
+                    batch = changes[start : start + self.batch_size]
+                    if failed.is_set():
+                        errors = ["Not applied: an earlier batch failed"]
+                        output.extend(
+                            ("Failure", p["type"], p["name"], p["content"], errors)
+                            for _, p in changes[start:]
+                        )
+                        break
+                    batch_params = {"posts": [], "patches": []}
+                    for operation, params in batch:
+                        batch_params[operation].append(params)
+                    batch_data = json.dumps(batch_params)
+                    with session.post(endpoint, data=batch_data) as res_raw:
+                        res_json = res_raw.json()
+                        if res_raw.status_code in (401, 403, 405, 415, 429):
+                            # For HTTP responses that would indicate a code-level
+                            # issue, raise exception
+                            raise RuntimeError(
+                                (res_raw.status_code, zone_id, res_json["errors"])
+                            )
+                        status = "Success" if res_json.get("success") else "Failure"
+                        if status == "Failure":
+                            failed.set()
+                        for _, params in batch:
+                            output.append(
+                                (
+                                    status,
+                                    params["type"],
+                                    params["name"],
+                                    params["content"],
+                                    res_json["errors"],
+                                )
+                            )
+        except requests.exceptions.RequestException as req_exception:
+            failed.set()
+            raise RuntimeError(req_exception)
+        except RuntimeError:
+            failed.set()
+            raise
+        return output
+
+    def apply_plan(self, provider_plan):
+        """Verifies the plan was made against this account and every planned zone is \
+        unchanged, then applies each zone's changes concurrently without \
+        re-constructing records or re-looking up zone IDs. Stops sending batches \
+        after the first failed one; see apply_zone"""
+        if provider_plan["account"] != self.account():
+            raise AttributeError(
+                (
+                    f"Plan was made for {provider_plan['account']['email']} at "
+                    f"{provider_plan['account']['baseurl']}, not "
+                    f"{self.api['email']} at {self.url}. Zone IDs differ between "
+                    "accounts; create a new plan with this account's config."
+                )
+            )
+        zone_plans = provider_plan["zones"]
+        failed = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for future in [
+                executor.submit(self.verify_zone, zone_id, zone_plan)
+                for zone_id, zone_plan in zone_plans.items()
+            ]:
+                future.result()
+            futures = [
+                executor.submit(self.apply_zone, zone_id, zone_plan, failed)
+                for zone_id, zone_plan in zone_plans.items()
+            ]
+            output = []
+            for future in futures:
+                output.extend(future.result())
+        return output
+
+
+# Supported providers, by config name
+providers = {"cloudflare": cloudflare}
@@ -184,6 +184,8 @@ def tenant_records(crm_id=None, host4=None, host6=None, prefix4=None, prefix6=No
     }
     """
     # pylint: disable=too-many-branches
+    if crm_id and isinstance(crm_id, int):
+        crm_id = str(crm_id)
     if prefix4:
         try:
             addrlist4 = [ip for ip in ipaddress.ip_network(prefix4)]
@@ -222,3 +224,51 @@ def tenant_records(crm_id=None, host4=None, host6=None, prefix4=None, prefix6=No
     if not records_list:
         raise RuntimeError("No records were created.")
     return records_list
+
+
+def dedupe_records(records):
+    """
+    Single pass over a constructed record list, using hash indexes to
+    drop identical records and detect conflicting ones before any API
+    call is made. Records are considered conflicting when:
+
+    - The same zone, name, and type map to different content (e.g. two
+      input lines pointing the same PTR at different hosts).
+    - A CNAME shares a zone & name with any other record.
+
+    Returns the de-duplicated record list, preserving input order.
+    """
+    seen = set()
+    content_index = {}
+    type_index = {}
+    conflicts = []
+    records_out = []
+    for record in records:
+        zone_name = [zone for zone in record.keys()][0]
+        params = record[zone_name]
+        rec_type = params["type"]
+        rec_name = params["name"]
+        rec_content = params["content"]
+        record_key = (zone_name, rec_type, rec_name, rec_content)
+        if record_key in seen:
+            continue
+        seen.add(record_key)
+        existing = content_index.setdefault(
+            (zone_name, rec_type, rec_name), rec_content
+        )
+        if existing != rec_content:
+            conflicts.append(
+                f"{rec_type} {rec_name} in {zone_name} points to both "
+                f"{existing} and {rec_content}"
+            )
+        name_types = type_index.setdefault((zone_name, rec_name), set())
+        if "CNAME" in name_types | {rec_type} and name_types - {rec_type}:
+            conflicts.append(
+                f"CNAME {rec_name} in {zone_name} conflicts with "
+                f"{', '.join(sorted(name_types | {rec_type}))} records"
+            )
+        name_types.add(rec_type)
+        records_out.append(record)
+    if conflicts:
+        raise AttributeError("Conflicting records: " + "; ".join(conflicts))
+    return records_out
@@ -0,0 +1,119 @@
+"""
+Tests for thread-safe Cloudflare zone ID lookups
+"""
+# Standard Imports
+import time
+import threading
+
+# Third Party Imports
+import pytest
+
+# Project Imports
+from deenis import call
+
+PROVIDER_CONF = {
+    "api": {
+        "baseurl": "https://api.cloudflare.com/client/v4/",
+        "email": "name@example.com",
+        "key": "1234",
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Starts each test with cold caches"""
+    call.cache.clear()
+    call.lru_cache.clear()
+    call.inflight.clear()
+    yield
+    call.cache.clear()
+    call.lru_cache.clear()
+    call.inflight.clear()
+
+
+class slow_provider(call.cloudflare):
+    """Cloudflare provider with a slow, counted, mocked zone lookup"""
+
+    # pylint: disable=invalid-name
+
+    def __init__(self, provider_conf, error=None):
+        super().__init__(provider_conf)
+        self.error = error
+        self.fetches = 0
+
+    def fetch_zone_id(self, zone):
+        self.fetches += 1
+        time.sleep(0.2)
+        if self.error:
+            raise self.error
+        return "id-" + zone
+
+
+def concurrent_lookups(provider, zone, count=50):
+    """Looks up a zone ID from many threads at once"""
+    barrier = threading.Barrier(count)
+    results = []
+
+    def lookup():
+        barrier.wait()
+        try:
+            results.append(provider.get_zone_id(zone))
+        except RuntimeError as lookup_error:
+            results.append(lookup_error)
+
+    threads = [threading.Thread(target=lookup) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_lookups_share_one_fetch():
+    provider = slow_provider(PROVIDER_CONF)
+    results = concurrent_lookups(provider, "example.com")
+    assert provider.fetches == 1
+    assert results == ["id-example.com"] * 50
+    assert not call.inflight
+
+
+def test_failed_lookup_propagates_to_waiters():
+    error = RuntimeError("lookup failed")
+    provider = slow_provider(PROVIDER_CONF, error=error)
+    results = concurrent_lookups(provider, "example.com")
+    assert provider.fetches == 1
+    assert results == [error] * 50
+    assert not call.inflight
+
+
+def test_lookups_are_scoped_to_account():
+    staging = slow_provider(PROVIDER_CONF)
+    prod_conf = {"api": dict(PROVIDER_CONF["api"], email="prod@example.com")}
+    prod = slow_provider(prod_conf)
+    staging.get_zone_id("example.com")
+    prod.get_zone_id("example.com")
+    assert staging.fetches == 1
+    assert prod.fetches == 1
+
+
+def test_warm_lookup_skips_disk_cache(monkeypatch):
+    provider = slow_provider(PROVIDER_CONF)
+    provider.get_zone_id("example.com")
+
+    def disk_get(key):
+        raise AssertionError("disk cache read")
+
+    monkeypatch.setattr(call.cache, "get", disk_get)
+    assert provider.get_zone_id("example.com") == "id-example.com"
+    assert provider.fetches == 1
+
+
+def test_lru_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(call, "lru_size", 3)
+    for key in ("a", "b", "c"):
+        call.lru_set(key, key)
+    call.lru_get("a")
+    call.lru_set("d", "d")
+    assert list(call.lru_cache) == ["c", "a", "d"]
+    assert call.lru_get("b") is None
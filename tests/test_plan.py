@@ -0,0 +1,260 @@
+"""
+Tests for compiling and applying change plans
+"""
+# Standard Imports
+import json
+
+# Third Party Imports
+import yaml
+import pytest
+from click.testing import CliRunner
+
+# Project Imports
+import cli
+from deenis import Deenis
+from deenis import call
+
+STAGING = {
+    "api": {
+        "baseurl": "https://api.cloudflare.com/client/v4/",
+        "email": "staging@example.com",
+        "key": "1234",
+    }
+}
+PRODUCTION = {"api": dict(STAGING["api"], email="production@example.com")}
+
+
+def config(provider_conf):
+    """Builds a Deenis config for a single Cloudflare account"""
+    return {
+        "provider": {"cloudflare": provider_conf},
+        "zone": {
+            "2.0.192.in-addr.arpa": {
+                "direction": "reverse",
+                "providers": ["cloudflare"],
+            },
+            "example.com": {"direction": "forward", "providers": ["cloudflare"]},
+        },
+    }
+
+
+HOST = {"hostname": "h.example.com", "ipv4": "192.0.2.1", "ipv6": None}
+
+
+class fake_response:
+    """Minimal stand-in for a requests response"""
+
+    # pylint: disable=invalid-name
+
+    def __init__(self, res_json, status_code=200):
+        self.res_json = res_json
+        self.status_code = status_code
+
+    def json(self):
+        return self.res_json
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class fake_session:
+    """Serves zone IDs named after each zone, example.com's records, and records \
+    batch requests, failing them while state["fail"] is set"""
+
+    # pylint: disable=invalid-name
+
+    def __init__(self, state):
+        self.state = state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def close(self):
+        pass
+
+    def get(self, endpoint, params=None):
+        if endpoint.endswith("zones/"):
+            return fake_response({"result": [{"id": params["name"]}]})
+        records = self.state["records"] if "/example.com/" in endpoint else []
+        return fake_response(
+            {
+                "success": True,
+                "result": records,
+                "result_info": {"total_pages": 1},
+            }
+        )
+
+    def post(self, endpoint, data=None):
+        self.state["posts"].append(json.loads(data))
+        if self.state["fail"]:
+            return fake_response({"success": False, "errors": ["batch failed"]})
+        return fake_response({"success": True, "errors": []})
+
+
+@pytest.fixture
+def zone(monkeypatch):
+    """An example.com zone with one existing, proxied A record"""
+    call.cache.clear()
+    call.lru_cache.clear()
+    state = {
+        "records": [
+            {
+                "id": "rec1",
+                "type": "A",
+                "name": "h.example.com",
+                "content": "192.0.2.9",
+                "ttl": 300,
+                "proxied": True,
+            }
+        ],
+        "posts": [],
+        "fail": False,
+    }
+    monkeypatch.setattr(
+        call.cloudflare,
+        "provider_session",
+        lambda self: fake_session(state),
+    )
+    yield state
+    call.cache.clear()
+    call.lru_cache.clear()
+
+
+def test_plan_is_create_only_by_default(zone):
+    plan = Deenis(config(STAGING)).PlanHost(dict(HOST))
+    zone_plan = plan["providers"]["cloudflare"]["zones"]["example.com"]
+    assert [params["content"] for params in zone_plan["create"]] == ["192.0.2.1"]
+    assert zone_plan["update"] == []
+
+
+def test_plan_replace_overwrites_existing_record(zone):
+    plan = Deenis(config(STAGING)).PlanHost(dict(HOST), replace=True)
+    zone_plan = plan["providers"]["cloudflare"]["zones"]["example.com"]
+    assert zone_plan["create"] == []
+    update = zone_plan["update"][0]
+    assert update["id"] == "rec1"
+    assert update["content"] == "192.0.2.1"
+    assert (update["ttl"], update["proxied"]) == (300, True)
+
+
+def test_plan_matches_names_case_insensitively(zone):
+    plan = Deenis(config(STAGING)).PlanHost(
+        {"hostname": "H.example.com", "ipv4": "192.0.2.9", "ipv6": None}
+    )
+    assert "example.com" not in plan["providers"]["cloudflare"]["zones"]
+
+
+def test_apply_batches_planned_changes(zone):
+    deenis = Deenis(config(STAGING))
+    results = deenis.Apply(deenis.PlanHost(dict(HOST)))
+    assert ("Success", "A", "h.example.com", "192.0.2.1", []) in results
+    assert ("Success", "PTR", "1", "h.example.com", []) in results
+    assert len(zone["posts"]) == 2
+
+
+def test_apply_rejects_changed_zone(zone):
+    deenis = Deenis(config(STAGING))
+    plan = deenis.PlanHost(dict(HOST))
+    zone["records"].append(
+        {"id": "rec2", "type": "A", "name": "x.example.com", "content": "192.0.2.2"}
+    )
+    with pytest.raises(RuntimeError, match="has changed"):
+        deenis.Apply(plan)
+    assert zone["posts"] == []
+
+
+def test_apply_rejects_changed_proxy_status(zone):
+    deenis = Deenis(config(STAGING))
+    plan = deenis.PlanHost(dict(HOST), replace=True)
+    zone["records"][0]["proxied"] = False
+    with pytest.raises(RuntimeError, match="has changed"):
+        deenis.Apply(plan)
+
+
+def test_apply_stops_after_failed_batch(zone, monkeypatch):
+    monkeypatch.setattr(call.cloudflare, "max_workers", 1)
+    monkeypatch.setattr(call.cloudflare, "batch_size", 1)
+    deenis = Deenis(config(STAGING))
+    plan = deenis.PlanTenant(
+        {
+            "crm_id": 1,
+            "host4": "ip4.example.com",
+            "host6": None,
+            "prefix4": "192.0.2.0/30",
+            "prefix6": None,
+        }
+    )
+    zone["fail"] = True
+    results = deenis.Apply(plan)
+    assert len(zone["posts"]) == 1
+    assert [result[0] for result in results] == ["Failure"] * 4
+    assert results[0][4] == ["batch failed"]
+    assert results[1][4] == ["Not applied: an earlier batch failed"]
+
+
+def test_apply_rejects_other_account(zone):
+    plan = Deenis(config(STAGING)).PlanHost(dict(HOST))
+    with pytest.raises(AttributeError, match="staging@example.com"):
+        Deenis(config(PRODUCTION)).Apply(plan)
+    assert zone["posts"] == []
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [
+        {"version": 1},
+        {"version": 1, "providers": {"cloudflare": {"zones": {}}}},
+        {
+            "version": 1,
+            "providers": {
+                "cloudflare": {
+                    "account": {"baseurl": "u", "email": "e"},
+                    "zones": {"zone1": {"zone": "example.com", "create": []}},
+                }
+            },
+        },
+    ],
+)
+def test_apply_rejects_malformed_plan(plan):
+    with pytest.raises(AttributeError, match="Plan"):
+        Deenis(config(STAGING)).Apply(plan)
+
+
+def test_cli_uses_config_file_option(zone, tmp_path):
+    config_file = tmp_path.joinpath("production.yaml")
+    config_file.write_text(yaml.safe_dump(config(PRODUCTION)))
+    plan_file = tmp_path.joinpath("plan.json")
+    result = CliRunner().invoke(
+        cli.add_records,
+        [
+            "plan",
+            "host",
+            "-c",
+            str(config_file),
+            "-f",
+            "h.example.com",
+            "-4",
+            "192.0.2.1",
+            "-o",
+            str(plan_file),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    plan = json.loads(plan_file.read_text())
+    account = plan["providers"]["cloudflare"]["account"]
+    assert account["email"] == "production@example.com"
+
+
+def test_cli_rejects_missing_config_file(tmp_path):
+    result = CliRunner().invoke(
+        cli.add_records,
+        ["apply", "-c", str(tmp_path.joinpath("missing.yaml")), __file__],
+    )
+    assert result.exit_code == 2
+    assert "not found" in result.output
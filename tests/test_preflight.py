@@ -0,0 +1,101 @@
+"""
+Tests for pre-flight record validation
+"""
+# Third Party Imports
+import pytest
+
+# Project Imports
+from deenis import Deenis
+from deenis import construct
+
+CONF = {
+    "provider": {
+        "cloudflare": {
+            "api": {
+                "baseurl": "https://api.cloudflare.com/client/v4/",
+                "email": "name@example.com",
+                "key": "1234",
+            }
+        }
+    },
+    "zone": {
+        "2.0.192.in-addr.arpa": {
+            "direction": "reverse",
+            "providers": ["cloudflare"],
+        },
+        "example.com": {"direction": "forward", "providers": ["cloudflare"]},
+    },
+}
+
+
+def tenant(crm_id, prefix4):
+    """Builds TenantReverse input parameters"""
+    return {
+        "crm_id": crm_id,
+        "host4": "ip4.example.com",
+        "host6": None,
+        "prefix4": prefix4,
+        "prefix6": None,
+    }
+
+
+def test_dedupe_drops_overlapping_records():
+    records = construct.tenant_records(**tenant("1", "192.0.2.0/30"))
+    records += construct.tenant_records(**tenant("1", "192.0.2.2/31"))
+    assert len(construct.dedupe_records(records)) == 4
+
+
+def test_dedupe_rejects_conflicting_records():
+    records = construct.tenant_records(**tenant("1", "192.0.2.0/30"))
+    records += construct.tenant_records(**tenant("2", "192.0.2.2/31"))
+    with pytest.raises(AttributeError, match="points to both"):
+        construct.dedupe_records(records)
+
+
+def test_dedupe_rejects_cname_conflicts():
+    records = [
+        {"example.com": {"type": "A", "name": "www", "content": "192.0.2.1"}},
+        {"example.com": {"type": "CNAME", "name": "www", "content": "example.com"}},
+    ]
+    with pytest.raises(AttributeError, match="CNAME www"):
+        construct.dedupe_records(records)
+
+
+def test_preflight_rejects_undefined_zones():
+    records = construct.tenant_records(**tenant("1", "198.51.100.0/30"))
+    with pytest.raises(AttributeError, match="Zone 100.51.198.in-addr.arpa"):
+        Deenis(CONF).preflight(records)
+
+
+@pytest.mark.parametrize("provider", ["cache", "ThreadPoolExecutor"])
+def test_preflight_rejects_unsupported_providers(provider):
+    conf = {
+        "provider": {provider: {"api": {}}},
+        "zone": {"example.com": {"providers": [provider]}},
+    }
+    records = [{"example.com": {"type": "A", "name": "a", "content": "192.0.2.1"}}]
+    with pytest.raises(AttributeError, match=f"Provider {provider} is not supported"):
+        Deenis(conf).preflight(records)
+
+
+def test_bulk_tenant_reverse_fails_before_any_call(monkeypatch):
+    def add_record(*args):
+        raise AssertionError("add_record called")
+
+    monkeypatch.setattr("deenis.call.cloudflare.add_record", add_record)
+    inputs = [tenant(1, "192.0.2.0/30"), tenant(2, "192.0.2.2/31")]
+    with pytest.raises(AttributeError, match="Conflicting records"):
+        Deenis(CONF).BulkTenantReverse(inputs)
+
+
+def test_bulk_tenant_reverse_adds_overlapping_records_once(monkeypatch):
+    added = []
+
+    def add_record(self, targets):
+        added.extend(targets)
+        return []
+
+    monkeypatch.setattr("deenis.call.cloudflare.add_record", add_record)
+    inputs = [tenant(1, "192.0.2.0/30"), tenant(1, "192.0.2.2/31")]
+    Deenis(CONF).BulkTenantReverse(inputs)
+    assert len(added) == 4